@@ -46,7 +46,7 @@ def set_max_process(num=None, max_num=None):
     """
     # NOTE: I think we should use a conservative default, e.g. 0.25*cpu_count()
     # TODO: limit to 30-40?, i.e never higher even if we have 1111 cores?
-    global _SEMAPHORES
+    global _SEMAPHORES, _GLOBALS
     if num is None:
         logical_cpu_count = os.cpu_count()
         if logical_cpu_count is not None:
@@ -59,6 +59,8 @@ def set_max_process(num=None, max_num=None):
     if max_num is not None:
         num = min((num, max_num))
     _SEMAPHORES["MAX_PROCESS"] = asyncio.BoundedSemaphore(num)
+    # also remember the number, e.g. to size thread pools accordingly
+    _GLOBALS["MAX_PROCESS"] = num
 
 
 set_max_process()
@@ -13,6 +13,7 @@
 # You should have received a copy of the GNU General Public License
 # along with asyncmd. If not, see <https://www.gnu.org/licenses/>.
 from .functionwrapper import (PyTrajectoryFunctionWrapper,
+                              NumbaTrajectoryFunctionWrapper,
                               SlurmTrajectoryFunctionWrapper,
                               )
 from .propagate import (ConditionalTrajectoryPropagator,
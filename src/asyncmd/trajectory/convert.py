@@ -17,7 +17,10 @@ import abc
 import typing
 import asyncio
 import logging
+import weakref
 import functools
+import threading
+import contextlib
 from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 import MDAnalysis as mda
@@ -36,6 +39,11 @@ from .trajectory import Trajectory
 logger = logging.getLogger(__name__)
 
 
+# R in units such that sqrt(T * _R_TIMES_TENTH / m) is the Maxwell-Boltzmann
+# sigma in \AA / ps for m in g / mol (see RandomVelocitiesFrameExtractor)
+_R_TIMES_TENTH = constants.R * 0.1
+
+
 def _is_documented_by(original):
     """
     Decorator to copy the docstring of a given method to the decorated method.
@@ -97,6 +105,37 @@ def _attach_mda_trafos_to_universe(
     return universe
 
 
+def _universe_from_traj(
+        traj: Trajectory,
+        mda_transformations: typing.Optional[list[typing.Callable]] = None,
+        mda_transformations_setup_func: typing.Optional[typing.Callable] = None,
+                        ) -> mda.Universe:
+    """
+    Create a MDAnalysis universe for the given trajectory.
+
+    Parameters
+    ----------
+    traj : Trajectory
+        The :class:`asyncmd.Trajectory` to create the universe for.
+    mda_transformations : typing.Optional[list[typing.Callable]], optional
+        List of MDAnalysis transformations to attach, by default None
+    mda_transformations_setup_func : typing.Optional[typing.Callable], optional
+        Setup function to attach MDAnalysis transformatiosn to the universe,
+        by default None
+
+    Returns
+    -------
+    MDAnalysis.core.universe.Universe
+        The universe with on-the-fly transformations attached.
+    """
+    universe = mda.Universe(traj.structure_file, *traj.trajectory_files)
+    return _attach_mda_trafos_to_universe(
+        universe=universe,
+        mda_transformations=mda_transformations,
+        mda_transformations_setup_func=mda_transformations_setup_func,
+        )
+
+
 class TrajectoryConcatenator:
     """
     Create concatenated trajectory from given trajectories and frames.
@@ -162,6 +201,33 @@ class TrajectoryConcatenator:
         self.mda_transformations = mda_transformations
         self.mda_transformations_setup_func = mda_transformations_setup_func
 
+    def _make_universe(self, traj: Trajectory,
+                       topologies: dict) -> mda.Universe:
+        # create the universe for traj with our mda trafos attached
+        # topologies maps structure files to (pristine) parsed mda topologies,
+        # such that we parse every structure file only once and build the
+        # universes for other trajs with the same structure from a copy
+        # NOTE: we always use a copy such that no two universes share (and
+        #       potentially modify) the same topology object
+        topology = topologies.get(traj.structure_file, None)
+        if topology is None:
+            u = mda.Universe(traj.structure_file, *traj.trajectory_files)
+            # NOTE: there is no public accessor for the topology
+            topologies[traj.structure_file] = u._topology.copy()
+        else:
+            u = mda.Universe(topology.copy(), *traj.trajectory_files)
+        return _attach_mda_trafos_to_universe(
+            universe=u,
+            mda_transformations=self.mda_transformations,
+            mda_transformations_setup_func=self.mda_transformations_setup_func,
+            )
+
+    @staticmethod
+    def _same_files(traj_a: Trajectory, traj_b: Trajectory) -> bool:
+        # whether both trajs can be read with the same universe
+        return (traj_a.structure_file == traj_b.structure_file
+                and traj_a.trajectory_files == traj_b.trajectory_files)
+
     def concatenate(self, trajs: "list[Trajectory]", slices: "list[tuple]",
                     tra_out: str, struct_out: typing.Optional[str] = None,
                     overwrite: bool = False,
@@ -190,7 +256,11 @@ class TrajectoryConcatenator:
             output trajectory.
             Note that we use a simple heuristic to determine double frames,
             we just check if the integration time is the same for both frames,
-            by default True
+            by default True.
+            Every frame is compared to the last written frame, i.e. double
+            frames are removed everywhere in the output, also inside of a
+            segment (including the first segment, e.g. for multipart
+            trajectories with repeated frames at the part boundaries).
 
         Returns
         -------
@@ -216,52 +286,117 @@ class TrajectoryConcatenator:
                         f"Output structure file must exist ({struct_out})."
                                     )
 
-        # special treatment for traj0 because we need n_atoms for the writer
-        u0 = mda.Universe(trajs[0].structure_file, *trajs[0].trajectory_files)
-        u0 = _attach_mda_trafos_to_universe(
-            universe=u0,
-            mda_transformations=self.mda_transformations,
-            mda_transformations_setup_func=self.mda_transformations_setup_func,
-            )
-        start0, stop0, step0 = slices[0]
-        if remove_double_frames:
-            last_time_seen = None
-        # if the file exists MDAnalysis will silently overwrite
-        with mda.Writer(tra_out, n_atoms=u0.trajectory.n_atoms) as W:
-            for ts in u0.trajectory[start0:stop0:step0]:
-                if (self.invert_v_for_negative_step and step0 < 0
-                        and ts.has_velocities):
-                    u0.atoms.velocities *= -1
-                W.write(u0.atoms)
-                if remove_double_frames:
-                    # remember the last timestamp, so we can take it out
-                    last_time_seen = ts.data["time"]
-            # close the trajectory file for and delete the original universe
-            u0.trajectory.close()
-            del u0
-            for traj, sl in zip(trajs[1:], slices[1:]):
-                u = mda.Universe(traj.structure_file, *traj.trajectory_files)
-                u = _attach_mda_trafos_to_universe(
-                    universe=u,
-                    mda_transformations=self.mda_transformations,
-                    mda_transformations_setup_func=self.mda_transformations_setup_func,
-                    )
-                start, stop, step = sl
-                for ts in u.trajectory[start:stop:step]:
-                    if remove_double_frames and (last_time_seen is not None):
-                        if last_time_seen == ts.data["time"]:
-                            # this is a no-op, as they are they same...
-                            # last_time_seen = ts.data["time"]
-                            continue  # skip this timestep/go to next iteration
-                    if (self.invert_v_for_negative_step and step < 0
-                            and ts.has_velocities):
-                        u.atoms.velocities *= -1
-                    W.write(u.atoms)
-                    if remove_double_frames:
-                        last_time_seen = ts.data["time"]
+        # indices of all segments that need a new universe, i.e. the first
+        # segment and all segments from a different trajectory than the
+        # preceeding segment. Consecutive segments from the same trajectory
+        # (e.g. the TPS case of taking one traj backwards and then forwards)
+        # reuse the universe, no need to parse the topology again
+        new_universe_idxs = [i for i in range(1, len(trajs))
+                             if not self._same_files(trajs[i], trajs[i - 1])
+                             ]
+        upcoming_idxs = iter(new_universe_idxs)
+        # parsed topologies by structure file, see _make_universe
+        # NOTE: this is only modified from one thread at a time, first by us
+        #       and then by the (single) prefetch thread
+        topologies = {}
+        # we create the universe for the first segment directly, because we
+        # need n_atoms for the writer
+        u = self._make_universe(trajs[0], topologies)
+        # and all others in a separate thread, such that the next universe
+        # (topology parsing, opening the trajectory files) is created while
+        # we are writing out the frames of the current segment
+        with ThreadPoolExecutor(max_workers=1,
+                                thread_name_prefix="concat_prefetch_thread",
+                                ) as prefetcher:
+            next_idx = next(upcoming_idxs, None)
+            next_u = (None if next_idx is None
+                      else prefetcher.submit(self._make_universe,
+                                             trajs[next_idx], topologies)
+                      )
+            try:
+                # if the file exists MDAnalysis will silently overwrite
+                # NOTE: we let MDAnalysis open the output file itself, the XDR
+                #       based writers (xtc, trr) do their IO via libxdrfile on
+                #       a C-level (stdio buffered) FILE and do not accept
+                #       python file objects, so we can not wrap them in a
+                #       larger python buffer anyway
+                with mda.Writer(tra_out, n_atoms=u.trajectory.n_atoms) as W:
+                    # bind everything that is constant over the frame loops
+                    write = W.write
+                    atoms = u.atoms
+                    last_time_seen = None
+                    for i, (start, stop, step) in enumerate(slices):
+                        if i == next_idx:
+                            u_next = next_u.result()
+                            # make sure MDAnalysis closes the underlying
+                            # trajectory file before we move on
+                            u.trajectory.close()
+                            u = u_next
+                            atoms = u.atoms
+                            next_idx = next(upcoming_idxs, None)
+                            next_u = (None if next_idx is None
+                                      else prefetcher.submit(self._make_universe,
+                                                             trajs[next_idx],
+                                                             topologies)
+                                      )
+                        invert = self.invert_v_for_negative_step and step < 0
+                        # NOTE: segments with negative step are read backwards,
+                        #       for xtc/trr MDAnalysis has an offset index so
+                        #       every frame is a direct seek (no rescanning).
+                        #       Reading forward and writing reversed would mean
+                        #       to keep whole timesteps in memory and to write
+                        #       them out by swapping the readers timestep, as
+                        #       MDAnalysis writers only take atomgroups/universes
+                        # NOTE: the reader fills ts with fresh values from disk
+                        #       for every frame, so negating ts.velocities
+                        #       inplace flips the sign exactly once per
+                        #       written frame, i.e. we always have
+                        #       written_velocities == -1 * velocities_on_disk
+                        #       if invert. We negate ts.velocities directly
+                        #       because atoms.velocities returns a copy.
+                        # NOTE: we check for double frames while writing and do
+                        #       not precompute a mask of frames to keep,
+                        #       because the time of a frame is only known after
+                        #       the reader decoded it, i.e. a mask would mean
+                        #       reading every segment twice.
+                        #       Also note that double frames are not only
+                        #       expected at segment boundaries, multipart
+                        #       trajectories (with the last frame of a part
+                        #       repeated as first frame of the next part) can
+                        #       contain them anywhere in a segment.
+                        # NOTE: we compare the (integration) time and not the
+                        #       integer step as documented, not every format
+                        #       has step information for every frame and
+                        #       both values are read from the same file, i.e.
+                        #       double frames have bitwise equal times
+                        # we decide once per segment which loop to use, such
+                        # that the frame loops contain no unneeded branches
+                        if remove_double_frames:
+                            for ts in u.trajectory[start:stop:step]:
+                                t = ts.data["time"]
+                                if last_time_seen == t:
+                                    # skip this timestep/go to next iteration
+                                    continue
+                                if invert and ts.has_velocities:
+                                    np.negative(ts.velocities, out=ts.velocities)
+                                write(atoms)
+                                # remember the last timestamp, so we can take
+                                # it out if it comes again
+                                last_time_seen = t
+                        else:
+                            for ts in u.trajectory[start:stop:step]:
+                                if invert and ts.has_velocities:
+                                    np.negative(ts.velocities, out=ts.velocities)
+                                write(atoms)
+            finally:
                 # make sure MDAnalysis closes the underlying trajectory file
                 u.trajectory.close()
                 del u  # and delete the universe just because we can
+                # we only have a prefetched universe left if we did not make
+                # it through all segments, make sure its files are closed too
+                if (next_u is not None and not next_u.cancel()
+                        and next_u.exception() is None):
+                    next_u.result().trajectory.close()
         # return (file paths to) the finished trajectory
         return Trajectory(tra_out, struct_out)
 
@@ -296,6 +431,13 @@ class FrameExtractor(abc.ABC):
     Implements the `extract` method which is common in all FrameExtractors.
     Subclasses only need to implement `apply_modification` which is called by
     `extract` to modify the frame just before writing it out.
+
+    Attributes
+    ----------
+    keep_universe_open : bool
+        Whether to keep the universe (and the trajectory files) of the last
+        trajectory we extracted from open, such that extracting more frames
+        from it does not need to parse the topology again. See :meth:`close`.
     """
 
     # extract a single frame with given idx from a trajectory and write it out
@@ -306,6 +448,7 @@ class FrameExtractor(abc.ABC):
         self,
         mda_transformations: typing.Optional[list[typing.Callable]] = None,
         mda_transformations_setup_func: typing.Optional[typing.Callable] = None,
+        keep_universe_open: bool = False,
                  ) -> None:
         """
         Initialize a :class:`FrameExtractor`.
@@ -332,6 +475,12 @@ class FrameExtractor(abc.ABC):
             universe with trafos.
             See https://docs.mdanalysis.org/stable/documentation_pages/trajectory_transformations.html
             for more on MDAnalysis transformations.
+        keep_universe_open : bool, optional
+            Whether to keep the universe of the last trajectory we extracted
+            from open for subsequent extractions from the same trajectory,
+            by default False. Note that the trajectory files then stay open
+            (independently of the MAX_FILES_OPEN semaphore) until
+            :meth:`close` is called or we extract from another trajectory.
         """
         if (mda_transformations is not None
             and mda_transformations_setup_func is not None):
@@ -341,6 +490,87 @@ class FrameExtractor(abc.ABC):
                              )
         self.mda_transformations = mda_transformations
         self.mda_transformations_setup_func = mda_transformations_setup_func
+        self.keep_universe_open = keep_universe_open
+        # the universe of the trajectory we last extracted from (only used if
+        # keep_universe_open), we keep it around such that extracting multiple
+        # frames from the same trajectory (e.g. in TPS) parses the topology
+        # only once, the lock makes sure only one thread uses it at a time
+        self._cached_universe = (None, None)  # (key, universe)
+        self._cached_universe_lock = threading.Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        # cant pickle the lock and the universe (with its open files)
+        state["_cached_universe"] = (None, None)
+        state["_cached_universe_lock"] = None
+        return state
+
+    def __setstate__(self, d: dict):
+        # defaults for attributes that objects pickled with older versions
+        # of asyncmd do not have
+        d.setdefault("keep_universe_open", False)
+        d["_cached_universe"] = (None, None)
+        self.__dict__ = d
+        self._cached_universe_lock = threading.Lock()
+
+    def close(self) -> None:
+        """
+        Close the cached universe (and its open trajectory files).
+
+        If ``keep_universe_open`` is True, the universe of the last
+        trajectory we extracted from is kept open to make extracting more
+        frames from it cheap, call this method when you are done extracting
+        to release the open files. It is safe to continue extracting
+        afterwards (the universe is then recreated).
+        """
+        with self._cached_universe_lock:
+            _, u = self._cached_universe
+            self._cached_universe = (None, None)
+            if u is not None:
+                u.trajectory.close()
+
+    @contextlib.contextmanager
+    def _universe_for(self, traj: Trajectory):
+        # context manager yielding a universe with our mda trafos for traj
+        # if keep_universe_open we use (and update) the cached universe if no
+        # other thread uses it, otherwise we create (and close) a private
+        # universe for the caller
+        # NOTE: the trafos are part of the key, such that (re)setting them
+        #       (they are public attributes) invalidates the cached universe
+        mda_trafos = self.mda_transformations
+        key = (traj.structure_file, tuple(traj.trajectory_files),
+               traj.trajectory_hash,
+               None if mda_trafos is None else tuple(mda_trafos),
+               self.mda_transformations_setup_func,
+               )
+        if (not self.keep_universe_open
+                or not self._cached_universe_lock.acquire(blocking=False)):
+            u = _universe_from_traj(
+                traj=traj,
+                mda_transformations=self.mda_transformations,
+                mda_transformations_setup_func=self.mda_transformations_setup_func,
+                )
+            try:
+                yield u
+            finally:
+                # make sure MDAnalysis closes the underlying trajectory files
+                u.trajectory.close()
+            return
+        try:
+            cached_key, u = self._cached_universe
+            if cached_key != key:
+                if u is not None:
+                    u.trajectory.close()
+                self._cached_universe = (None, None)
+                u = _universe_from_traj(
+                    traj=traj,
+                    mda_transformations=self.mda_transformations,
+                    mda_transformations_setup_func=self.mda_transformations_setup_func,
+                    )
+                self._cached_universe = (key, u)
+            yield u
+        finally:
+            self._cached_universe_lock.release()
 
     @abc.abstractmethod
     def apply_modification(self,
@@ -356,6 +586,10 @@ class FrameExtractor(abc.ABC):
         universe objects **inplace**.
         After this function finishes the frame is written out, i.e. with any
         potential modifications applied.
+        Note that the universe is reused when extracting further frames from
+        the same trajectory, i.e. modifications of the timestep are reset
+        when the next frame is read but modifications of the universe itself
+        (e.g. its topology) persist.
         No return value is expected or considered from this method, the
         modifications of the timestep/universe are nonlocal anyway.
 
@@ -405,8 +639,51 @@ class FrameExtractor(abc.ABC):
         # TODO: should we check that idx is an idx, i.e. an int?
         # TODO: make it possible to select a subset of atoms to write out
         #       and also for modification?
-        # TODO: should we make it possible to extract multiple frames, i.e.
-        #       enable the use of slices (and iterables of indices?)
+        # NOTE: see extract_many to extract multiple frames at once
+        return self.extract_many(outfile=outfile, traj_in=traj_in,
+                                 indices=[idx], struct_out=struct_out,
+                                 overwrite=overwrite,
+                                 )
+
+    def extract_many(self, outfile, traj_in: Trajectory,
+                     indices: "list[int]", struct_out=None,
+                     overwrite: bool = False) -> Trajectory:
+        """
+        Extract multiple frames from given trajectory and write them out.
+
+        All frames are written to the same output trajectory, in the order
+        given by `indices`, using one universe and one writer, i.e. this is
+        much cheaper than calling :meth:`extract` for every frame.
+
+        Parameters
+        ----------
+        outfile : str
+            Absolute or relative path to the output trajectory. Expected to be
+            with file ending, e.g. "traj.trr".
+        traj_in : Trajectory
+            Input trajectory from which we will extract the frames.
+        indices : list[int]
+            Indices of the frames to extract in `traj_in`.
+        struct_out : str, optional
+            None, or absolute or relative path to a structure file,
+            by default None. If not None we will use the given file as
+            structure file for the returned trajectory object, else we use the
+            structure file of `traj_in`.
+        overwrite : bool, optional
+            Whether to overwrite `outfile` if it exists, by default False.
+
+        Returns
+        -------
+        Trajectory
+            Trajectory object holding a trajectory with the extracted frames.
+
+        Raises
+        ------
+        FileExistsError
+            If `outfile` exists and `overwrite=False`.
+        FileNotFoundError
+            If `struct_out` is given but does not exist.
+        """
         outfile = os.path.relpath(outfile)
         if os.path.exists(outfile) and not overwrite:
             raise FileExistsError(f"overwrite=False but outfile={outfile} exists.")
@@ -418,19 +695,17 @@ class FrameExtractor(abc.ABC):
             raise FileNotFoundError("Output structure file must exist."
                                     + f"(given struct_out is {struct_out})."
                                     )
-        u = mda.Universe(traj_in.structure_file, *traj_in.trajectory_files)
-        u = _attach_mda_trafos_to_universe(
-            universe=u,
-            mda_transformations=self.mda_transformations,
-            mda_transformations_setup_func=self.mda_transformations_setup_func,
-            )
-        with mda.Writer(outfile, n_atoms=u.trajectory.n_atoms) as W:
-            ts = u.trajectory[idx]
-            self.apply_modification(u, ts)
-            W.write(u.atoms)
-        # make sure MDAnalysis closes the underlying trajectory files
-        u.trajectory.close()
-        del u
+        with self._universe_for(traj_in) as u:
+            # bind everything that is constant over the frame loop to locals
+            trajectory = u.trajectory
+            atoms = u.atoms
+            apply_modification = self.apply_modification
+            with mda.Writer(outfile, n_atoms=trajectory.n_atoms) as W:
+                write = W.write
+                for idx in indices:
+                    ts = trajectory[idx]
+                    apply_modification(u, ts)
+                    write(atoms)
         return Trajectory(trajectory_files=outfile, structure_file=struct_out)
 
     @_is_documented_by(extract)
@@ -452,6 +727,26 @@ class FrameExtractor(abc.ABC):
                                         ) as pool:
                     return await loop.run_in_executor(pool, extract_fx)
 
+    @_is_documented_by(extract_many)
+    # pylint: disable-next=missing-function-docstring
+    async def extract_many_async(self, outfile, traj_in: Trajectory,
+                                 indices: "list[int]", struct_out=None,
+                                 overwrite: bool = False) -> Trajectory:
+        extract_fx = functools.partial(self.extract_many,
+                                       outfile=outfile,
+                                       traj_in=traj_in,
+                                       indices=indices,
+                                       struct_out=struct_out,
+                                       overwrite=overwrite,
+                                       )
+        loop = asyncio.get_running_loop()
+        async with _SEMAPHORES["MAX_FILES_OPEN"]:
+            async with _SEMAPHORES["MAX_PROCESS"]:
+                with ThreadPoolExecutor(max_workers=1,
+                                        thread_name_prefix="concat_thread",
+                                        ) as pool:
+                    return await loop.run_in_executor(pool, extract_fx)
+
 
 class NoModificationFrameExtractor(FrameExtractor):
     """Extract a frame from a trajectory, write it out without modification."""
@@ -491,7 +786,11 @@ class InvertedVelocitiesFrameExtractor(FrameExtractor):
         ts : MDAnalysis.coordinates.base.Timestep
             The mdanalysis timestep of the frame to extract.
         """
-        ts.velocities *= -1.
+        try:
+            np.negative(ts.velocities, out=ts.velocities)
+        except ValueError:
+            # the velocities array is read-only (e.g. a view into the file)
+            ts.velocities = -ts.velocities
 
 
 class RandomVelocitiesFrameExtractor(FrameExtractor):
@@ -510,6 +809,8 @@ class RandomVelocitiesFrameExtractor(FrameExtractor):
         T: float,
         mda_transformations: typing.Optional[list[typing.Callable]] = None,
         mda_transformations_setup_func: typing.Optional[typing.Callable] = None,
+        masses: typing.Optional[np.ndarray] = None,
+        keep_universe_open: bool = False,
         ) -> None:
         """
         Initialize a :class:`RandomVelocitiesFrameExtractor`.
@@ -538,13 +839,128 @@ class RandomVelocitiesFrameExtractor(FrameExtractor):
             universe with trafos.
             See https://docs.mdanalysis.org/stable/documentation_pages/trajectory_transformations.html
             for more on MDAnalysis transformations.
+        masses : np.ndarray, optional
+            Atom masses (in g / mol) to use for all extracted frames, by
+            default None. If given, the masses are not taken from the
+            universes of the trajectories we extract from, which is useful
+            when extracting from many trajectories sharing the same topology.
+            See also :meth:`prepare`.
+        keep_universe_open : bool, optional
+            Whether to keep the universe of the last trajectory we extracted
+            from open for subsequent extractions from the same trajectory,
+            by default False. See :class:`FrameExtractor`.
         """
         super().__init__(
                 mda_transformations=mda_transformations,
                 mda_transformations_setup_func=mda_transformations_setup_func,
+                keep_universe_open=keep_universe_open,
                          )
         self.T = T  # in K
-        self._rng = np.random.default_rng()
+        self._rng = np.random.Generator(np.random.PCG64())
+        # per universe cache of (T, sigma), weak such that we do not keep
+        # the universes (and their open trajectory files) alive
+        self._sigma_cache = weakref.WeakKeyDictionary()
+        # (T, sigma) for the user supplied masses (if any)
+        self._masses = None
+        self._prepared_sigma = (None, None)
+        if masses is not None:
+            self._set_masses(masses)
+
+    def _set_masses(self, masses: np.ndarray) -> None:
+        self._masses = np.array(masses, dtype=np.float64)
+        self._prepared_sigma = (self.T, self._sigma_from_masses(self._masses))
+
+    def prepare(self, universe: mda.Universe) -> None:
+        """
+        Use the atom masses of the given universe for all extracted frames.
+
+        Snapshots the masses and precomputes the Maxwell-Boltzmann sigmas,
+        such that extracting from (many) trajectories sharing the topology of
+        `universe` never needs to look at their topologies for the masses.
+
+        Parameters
+        ----------
+        universe : MDAnalysis.core.universe.Universe
+            The mdanalysis universe to take the atom masses from.
+        """
+        self._set_masses(universe.atoms.masses)
+
+    def __getstate__(self):
+        state = super().__getstate__()
+        # cant pickle the weak dict, + the universes are gone when we unpickle
+        state["_sigma_cache"] = None
+        return state
+
+    def __setstate__(self, d: dict):
+        # defaults for objects pickled with older versions of asyncmd
+        d.setdefault("_masses", None)
+        d.setdefault("_prepared_sigma", (None, None))
+        super().__setstate__(d)
+        self._sigma_cache = weakref.WeakKeyDictionary()
+
+    def _sigma_from_masses(self, masses: np.ndarray) -> np.ndarray:
+        # m is in units of g / mol
+        # v should be in units of \AA / ps = 100 m / s
+        # which means m [10**-3 kg / mol] v**2 [10000 (m/s)**2]
+        # is in units of [ 10 kg m**s / (mol * s**2) ]
+        # so we use R = N_A * k_B [J / (mol * K) = kg m**2 / (s**2 * mol * K)]
+        # and add in a factor 10 to get 1/σ**2 = m / (k_B * T)
+        # in the correct units
+        # NOTE: we use float32 because that is what MDAnalysis uses for
+        #       velocities anyway
+        # NOTE: no need for numba or similar here, this is calculated only
+        #       once per universe (or masses) and temperature
+        s1d = np.sqrt((self.T * _R_TIMES_TENTH) / masses).astype(np.float32)
+        # sigma is the same for all 3 cartesian dimensions, we repeat it such
+        # that we can scale the (flattened, C-ordered) (n_atoms, 3) velocities
+        # with one contiguous elementwise multiplication
+        return np.repeat(s1d, 3)
+
+    def _get_sigma(self, universe: mda.Universe) -> np.ndarray:
+        """
+        Return the per-atom Maxwell-Boltzmann sigma with shape (3 * n_atoms,).
+
+        The sigma of every atom is repeated for the 3 cartesian dimensions,
+        i.e. the result matches the flattened (n_atoms, 3) velocity array.
+
+        Uses the masses given at initialization or via :meth:`prepare` if
+        any, otherwise the masses of the universe. The result is cached per
+        universe and temperature, i.e. note that changing the atom masses of
+        a universe after the first call will not be reflected in the
+        returned sigma.
+
+        Parameters
+        ----------
+        universe : MDAnalysis.core.universe.Universe
+            The mdanalysis universe to calculate sigma for.
+
+        Returns
+        -------
+        np.ndarray
+            Per-atom sigma, repeated for the 3 cartesian dimensions.
+
+        Raises
+        ------
+        ValueError
+            If masses were given but their number does not match the number
+            of atoms in the universe.
+        """
+        if self._masses is not None:
+            T, sigma = self._prepared_sigma
+            if T != self.T:
+                sigma = self._sigma_from_masses(self._masses)
+                self._prepared_sigma = (self.T, sigma)
+            if sigma.shape[0] != 3 * universe.atoms.n_atoms:
+                raise ValueError(f"Got masses for {sigma.shape[0] // 3} atoms, but "
+                                 + f"the universe has {universe.atoms.n_atoms}"
+                                 + " atoms."
+                                 )
+            return sigma
+        T, sigma = self._sigma_cache.get(universe, (None, None))
+        if T != self.T:
+            sigma = self._sigma_from_masses(universe.atoms.masses)
+            self._sigma_cache[universe] = (self.T, sigma)
+        return sigma
 
     def apply_modification(self,
                            universe: mda.Universe,
@@ -560,18 +976,26 @@ class RandomVelocitiesFrameExtractor(FrameExtractor):
         ts : MDAnalysis.coordinates.base.Timestep
             The mdanalysis timestep of the frame to extract.
         """
-        # m is in units of g / mol
-        # v should be in units of \AA / ps = 100 m / s
-        # which means m [10**-3 kg / mol] v**2 [10000 (m/s)**2]
-        # is in units of [ 10 kg m**s / (mol * s**2) ]
-        # so we use R = N_A * k_B [J / (mol * K) = kg m**2 / (s**2 * mol * K)]
-        # and add in a factor 10 to get 1/σ**2 = m / (k_B * T)
-        # in the correct units
-        scale = np.empty((ts.n_atoms, 3), dtype=np.float64)
-        s1d = np.sqrt((self.T * constants.R * 0.1)
-                      / universe.atoms.masses
+        # we draw standard normals and scale them with the per-atom sigma
+        # (repeated for the 3 cartesian dimensions, see _get_sigma)
+        # we draw in float32 directly, this is the dtype MDAnalysis uses for
+        # ts.velocities
+        # if possible we draw directly into the velocity buffer of ts, this
+        # saves the copy (and checks) of the ts.velocities setter
+        vels = ts.velocities if ts.has_velocities else None
+        own_buffer = (vels is None
+                      or vels.dtype != np.float32
+                      or not vels.flags.c_contiguous
+                      or not vels.flags.writeable
                       )
-        # sigma is the same for all 3 cartesian dimensions
-        for i in range(3):
-            scale[:, i] = s1d
-        ts.velocities = self._rng.normal(loc=0, scale=scale)
+        if own_buffer:
+            # NOTE: we draw into a buffer local to this call (and not one
+            #       stored on self), because extract_async can call us
+            #       concurrently from multiple threads
+            vels = np.empty((ts.n_atoms, 3), dtype=np.float32)
+        self._rng.standard_normal(dtype=np.float32, out=vels)
+        # vels is C-contiguous, i.e. reshape gives us a flat view
+        flat_vels = vels.reshape(-1)
+        np.multiply(flat_vels, self._get_sigma(universe), out=flat_vels)
+        if own_buffer:
+            ts.velocities = vels
@@ -16,18 +16,29 @@ import os
 import abc
 import shlex
 import asyncio
+import contextlib
 import inspect
 import logging
 import hashlib
 import functools
 import typing
+import weakref
+import collections.abc
+from types import MappingProxyType
 import aiofiles
 import aiofiles.os
 import numpy as np
+import MDAnalysis as mda
 from concurrent.futures import ThreadPoolExecutor
+try:
+    import numba
+except ImportError:
+    # numba is optional, without it the NumbaTrajectoryFunctionWrapper
+    # just calls the (uncompiled) python function
+    numba = None
 
 
-from .._config import _SEMAPHORES
+from .._config import _GLOBALS, _SEMAPHORES
 from .. import slurm
 from ..tools import ensure_executable_available, remove_file_if_exist_async
 from .trajectory import Trajectory
@@ -36,51 +47,248 @@ from .trajectory import Trajectory
 logger = logging.getLogger(__name__)
 
 
+# executor shared by all PyTrajectoryFunctionWrappers to run the wrapped
+# functions in, the number of concurrent calls is limited by the MAX_PROCESS
+# semaphore, so we just make sure that we have as many threads
+# (max_workers, executor), see _get_py_traj_func_executor
+_PY_TRAJ_FUNC_EXECUTOR = (None, None)
+
+
+def _get_py_traj_func_executor() -> ThreadPoolExecutor:
+    """
+    Return the executor to run the wrapped python functions in.
+
+    The executor is (re)created if the number of workers does not match the
+    currently configured maximum number of processes (see
+    :func:`asyncmd.config.set_max_process`).
+
+    Returns
+    -------
+    ThreadPoolExecutor
+        The shared executor.
+    """
+    global _PY_TRAJ_FUNC_EXECUTOR
+    max_workers, executor = _PY_TRAJ_FUNC_EXECUTOR
+    if executor is None or max_workers != _GLOBALS["MAX_PROCESS"]:
+        if executor is not None:
+            # does not wait for or cancel already submitted calls
+            executor.shutdown(wait=False)
+        max_workers = _GLOBALS["MAX_PROCESS"]
+        # NOTE: threads are only created on demand by the ThreadPoolExecutor
+        executor = ThreadPoolExecutor(max_workers=max_workers,
+                                      thread_name_prefix="PyTrajFunc_thread",
+                                      )
+        _PY_TRAJ_FUNC_EXECUTOR = (max_workers, executor)
+    return executor
+
+
+# cache of executable hashes (digests) by (path, mtime, size)
+# we use it to not read and hash the executable every time the id of a
+# SlurmTrajectoryFunctionWrapper is recalculated (e.g. when call_kwargs change)
+# NOTE: we (always) use BLAKE2b from hashlib and not a potentially faster
+#       hash from an optional dependency (e.g. BLAKE3), because the ids are
+#       used as keys for the persistent caches, i.e. they must not depend on
+#       which optional packages are installed on the machine computing them
+_EXE_HASH_CACHE = {}
+# executables are hashed in chunks of this size (in bytes), such that we never
+# need to hold the whole executable in memory
+# NOTE: only used for python < 3.11, i.e. without hashlib.file_digest
+_EXE_HASH_CHUNK_SIZE = 1 << 20
+_HAS_FILE_DIGEST = hasattr(hashlib, "file_digest")
+
+
+def _get_executable_digest(executable: str) -> bytes:
+    """
+    Return the BLAKE2b digest of the given executable (file).
+
+    The digest is cached and only recomputed if size or mtime of the file
+    changed.
+
+    Parameters
+    ----------
+    executable : str
+        Path to the executable.
+
+    Returns
+    -------
+    bytes
+        The digest of the file content.
+    """
+    # NOTE: 128 bit digests are plenty to distinguish executables and ids
+    st = os.stat(executable)
+    key = (executable, st.st_mtime_ns, st.st_size)
+    try:
+        return _EXE_HASH_CACHE[key]
+    except KeyError:
+        pass
+    # NOTE: no need for python side buffering, we read large chunks anyway
+    with open(executable, "rb", buffering=0) as exe_file:
+        if _HAS_FILE_DIGEST:
+            # reads into a preallocated buffer (no bytes object per chunk)
+            h = hashlib.file_digest(exe_file,
+                                    functools.partial(hashlib.blake2b,
+                                                      digest_size=16),
+                                    )
+        else:
+            h = hashlib.blake2b(digest_size=16)
+            for chunk in iter(lambda: exe_file.read(_EXE_HASH_CHUNK_SIZE),
+                              b""):
+                h.update(chunk)
+    digest = h.digest()
+    _EXE_HASH_CACHE[key] = digest
+    return digest
+
+
+# cache of function sources by function (object identity), such that we do
+# not need to retrieve (and parse) the source again every time the same
+# function is wrapped (or reassigned)
+# NOTE: weak keys, such that entries vanish together with the function
+_SRC_CACHE = weakref.WeakKeyDictionary()
+
+
+def _get_source(func) -> str:
+    """
+    Return the source of func using (and filling) the source cache.
+
+    Parameters
+    ----------
+    func : callable
+        The function to retrieve the source for.
+
+    Returns
+    -------
+    str
+        The source of func.
+
+    Raises
+    ------
+    OSError
+        If the source can not be retrieved (as `inspect.getsource`).
+    """
+    # NOTE: we key by the function object (functions hash and compare by
+    #       identity) and not by the code object, because code objects compare
+    #       equal for e.g. the same def-statement with different defaults in
+    #       different files/notebook cells. We also store the code object and
+    #       check its identity, such that reassigning __code__ is noticed.
+    # bound methods are recreated on every attribute access, use the function
+    func = getattr(func, "__func__", func)
+    code = getattr(func, "__code__", None)
+    if code is None:
+        # not a (python) function or method, e.g. a callable class instance
+        return inspect.getsource(func)
+    cached_code, src = _SRC_CACHE.get(func, (None, None))
+    if cached_code is code:
+        return src
+    src = inspect.getsource(func)
+    _SRC_CACHE[func] = (code, src)
+    return src
+
+
 # TODO: DaskTrajectoryFunctionWrapper?!
 class TrajectoryFunctionWrapper(abc.ABC):
     """Abstract base class to define the API and some common methods."""
+    # attributes that can be set via kwargs at initialization,
+    # maps attribute name to the expected type (type of the class default) or
+    # to None for properties with a setter (these do their own checking)
+    # NOTE: this is (re)calculated for every subclass in __init_subclass__
+    _KWARG_TYPES = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # collect the kwarg-settable attributes once per class (instead of
+        # using getattr on every init, which would e.g. call properties)
+        kwarg_types = {}
+        # go through the mro in reverse such that subclasses overwrite
+        for klass in reversed(cls.__mro__):
+            for name, attr in vars(klass).items():
+                if name.startswith("_"):
+                    # private (and dunder) attributes are not settable
+                    continue
+                if isinstance(attr, property):
+                    if attr.fset is not None:
+                        kwarg_types[name] = None
+                    else:
+                        kwarg_types.pop(name, None)
+                elif (callable(attr)
+                      or isinstance(attr, (staticmethod, classmethod))):
+                    kwarg_types.pop(name, None)
+                else:
+                    kwarg_types[name] = type(attr)
+        cls._KWARG_TYPES = kwarg_types
+
     def __init__(self, **kwargs) -> None:
-        # NOTE: in principal we should set these after the stuff set via kwargs
-        #       (otherwise users could overwrite them by passing _id="blub" to
-        #        init), but since the subclasses sets call_kwargs again and
-        #       have to calculate the id according to their own recipe anyway
-        #       we can savely set them here (this enables us to use the id
-        #        property at initialization time as e.g. in the slurm_jobname
-        #        of the SlurmTrajectoryFunctionWrapper)
+        # NOTE: we set these before the stuff set via kwargs (this enables us
+        #       to use the id property at initialization time as e.g. in the
+        #       slurm_jobname of the SlurmTrajectoryFunctionWrapper), users
+        #       can not overwrite them via kwargs because private attributes
+        #       are not in _KWARG_TYPES
         self._id = None
         self._call_kwargs = {}  # init to empty dict such that iteration works
-        # make it possible to set any attribute via kwargs
+        # make it possible to set any public attribute via kwargs
         # check the type for attributes with default values
-        dval = object()
+        kwarg_types = self._KWARG_TYPES
         for kwarg, value in kwargs.items():
-            cval = getattr(self, kwarg, dval)
-            if cval is not dval:
-                if isinstance(value, type(cval)):
-                    # value is of same type as default so set it
-                    setattr(self, kwarg, value)
-                else:
-                    raise TypeError(f"Setting attribute {kwarg} with "
-                                    + f"mismatching type ({type(value)}). "
-                                    + f" Default type is {type(cval)}."
-                                    )
+            try:
+                expected_type = kwarg_types[kwarg]
+            except KeyError:
+                # not a (settable) attribute of this class, ignore it
+                continue
+            if expected_type is not None and not isinstance(value,
+                                                            expected_type):
+                raise TypeError(f"Setting attribute {kwarg} with "
+                                + f"mismatching type ({type(value)}). "
+                                + f" Default type is {expected_type}."
+                                )
+            setattr(self, kwarg, value)
 
     @property
     def id(self) -> str:
+        """
+        Unique identifier for the wrapped function and its call_kwargs.
+
+        Calculated lazily on first access after any change, i.e. the
+        setters only invalidate it. Is None if no id can be calculated
+        (e.g. because the source of the wrapped function is not available).
+        """
+        if self._id is None:
+            self._id = self._get_id_str()
         return self._id
 
     @property
     def call_kwargs(self):
-        # return a copy to avoid people modifying entries without us noticing
-        # TODO/FIXME: this will make unhappy users if they try to set single
-        #             items in the dict!
-        return self._call_kwargs.copy()
+        # return a read-only view to avoid people modifying entries without us
+        # noticing (and without copying the dict on every access)
+        # NOTE: trying to set single items raises a TypeError, set the whole
+        #       dict instead, e.g. `wrapper.call_kwargs = {**old, "new": val}`
+        return MappingProxyType(self._call_kwargs)
 
     @call_kwargs.setter
     def call_kwargs(self, value):
-        if not isinstance(value, dict):
+        if not isinstance(value, collections.abc.Mapping):
             raise TypeError("call_kwargs must be a dictionary.")
-        self._call_kwargs = value
-        self._id = self._get_id_str()  # get/set ID
+        # copy, such that changing the original dict has no effect on us
+        self._call_kwargs = dict(value)
+        self._id = None  # invalidate ID, recalculated on next access
+
+    def _hash_call_kwargs(self, h) -> None:
+        # feed key-value pairs of call_kwargs into the (hashlib) hasher h
+        # we sort by key to get the same hash independent of dict order and
+        # separate all keys and values such that e.g. {"ab": "c"} and
+        # {"a": "bc"} result in different hashes
+        # NOTE: we join everything into one bytes object and update the
+        #       hasher only once (same hash as updating per key and value),
+        #       we do not use pickle/orjson for the serialization, because
+        #       their output is not guaranteed to be the same across versions
+        #       and machines (and the id is used for the persistent caches)
+        parts = []
+        for k, v in sorted(self._call_kwargs.items(),
+                           key=lambda kv: str(kv[0])):
+            parts.append(str(k))
+            parts.append(str(v))
+        if parts:
+            # every key and value is terminated by a null byte
+            parts.append("")
+            h.update("\0".join(parts).encode("utf-8"))
 
     @abc.abstractmethod
     def _get_id_str(self) -> str:
@@ -88,6 +296,7 @@ class TrajectoryFunctionWrapper(abc.ABC):
         # this should be unique and portable, i.e. it should enable us to make
         # ensure that the cached values will only be used for the same function
         # called with the same arguments
+        # it should return None if no id can be calculated (yet)
         pass
 
     @abc.abstractmethod
@@ -131,7 +340,15 @@ class PyTrajectoryFunctionWrapper(TrajectoryFunctionWrapper):
         The wrapped callable.
     call_kwargs : dict
         Keyword arguments for wrapped function.
+    run_inline : bool
+        Whether to call the wrapped function directly in the event loop
+        (instead of in a separate thread), by default False. Note that this
+        blocks the event loop for the duration of the function call, it is
+        only sensible for functions that return (very) fast, where the
+        overhead of running them in a thread dominates.
     """
+    run_inline = False
+
     def __init__(self, function, call_kwargs: typing.Optional[dict] = None,
                  **kwargs):
         """
@@ -146,10 +363,12 @@ class PyTrajectoryFunctionWrapper(TrajectoryFunctionWrapper):
             the keys will be used as keyword with the corresponding values,
             by default {}
         """
-        super().__init__(**kwargs)
+        # set these before superclass init, such that _get_id_str works
         self._func = None
         self._func_src = None
-        # use the properties to directly calculate/get the id
+        # function with call_kwargs filled in, created lazily (on first call)
+        self._partial = None
+        super().__init__(**kwargs)
         self.function = function
         if call_kwargs is None:
             call_kwargs = {}
@@ -157,24 +376,33 @@ class PyTrajectoryFunctionWrapper(TrajectoryFunctionWrapper):
 
     def __repr__(self) -> str:
         return (f"PyTrajectoryFunctionWrapper(function={self._func}, "
-                + f"call_kwargs={self.call_kwargs})"
+                + f"call_kwargs={self._call_kwargs})"
                 )
 
+    def __setstate__(self, d: dict):
+        # the partial is recreated on the next call, this also makes sure
+        # objects pickled with older versions of asyncmd (without it) work
+        d["_partial"] = None
+        self.__dict__ = d
+
     def _get_id_str(self):
         # calculate a hash over function src and call_kwargs dict
         # this should be unique and portable, i.e. it should enable us to make
         # ensure that the cached values will only be used for the same function
         # called with the same arguments
-        id = 0
-        # NOTE: addition is commutative, i.e. order does not matter here!
-        for k, v in self._call_kwargs.items():
-            # hash the value
-            id += int(hashlib.blake2b(str(v).encode('utf-8')).hexdigest(), 16)
-            # hash the key
-            id += int(hashlib.blake2b(str(k).encode('utf-8')).hexdigest(), 16)
+        if self._func_src is None:
+            # no source, no id, no caching
+            return None
+        h = hashlib.blake2b(digest_size=16)
+        self._hash_call_kwargs(h)
         # and add the func_src
-        id += int(hashlib.blake2b(str(self._func_src).encode('utf-8')).hexdigest(), 16)
-        return str(id)  # return a str because we want to use it as dict keys
+        h.update(self._func_src.encode("utf-8"))
+        return h.hexdigest()  # return a str because we want to use it as dict keys
+
+    @TrajectoryFunctionWrapper.call_kwargs.setter
+    def call_kwargs(self, value):
+        TrajectoryFunctionWrapper.call_kwargs.fset(self, value)
+        self._partial = None  # invalidate, recreated on next call
 
     @property
     def function(self):
@@ -186,20 +414,26 @@ class PyTrajectoryFunctionWrapper(TrajectoryFunctionWrapper):
     @function.setter
     def function(self, value):
         try:
-            src = inspect.getsource(value)
+            src = _get_source(value)
         except OSError:
             # OSError is raised if source can not be retrieved
             self._func_src = None
-            self._id = None
             logger.warning("Could not retrieve source for %s."
                            " No caching can/will be performed.",
                            value,
                            )
         else:
             self._func_src = src
-            self._id = self._get_id_str()  # get/set ID
         finally:
             self._func = value
+            self._id = None  # invalidate ID, recalculated on next access
+            self._partial = None  # invalidate, recreated on next call
+
+    def _make_partial(self):
+        # return the callable to apply (in the executor) on a trajectory
+        if len(self._call_kwargs) > 0:
+            return functools.partial(self._func, **self._call_kwargs)
+        return self._func
 
     async def get_values_for_trajectory(self, traj):
         """
@@ -215,13 +449,17 @@ class PyTrajectoryFunctionWrapper(TrajectoryFunctionWrapper):
         iterable, usually list or np.ndarray
             The values of the wrapped function when applied on the trajectory.
         """
+        # fill in additional kwargs (if any)
+        # we create the partial only once and reuse it until function or
+        # call_kwargs change (the setters reset it to None)
+        func = self._partial
+        if func is None:
+            func = self._partial = self._make_partial()
+        if self.run_inline:
+            # NOTE: this blocks the event loop until func returns
+            return func(traj)
         loop = asyncio.get_running_loop()
         async with _SEMAPHORES["MAX_PROCESS"]:
-            # fill in additional kwargs (if any)
-            if len(self.call_kwargs) > 0:
-                func = functools.partial(self.function, **self._call_kwargs)
-            else:
-                func = self.function
             # NOTE: even though one would expect pythonCVs to be CPU bound
             #       it is actually faster to use a ThreadPoolExecutor because
             #       we then skip the setup + import needed for a second process
@@ -235,10 +473,10 @@ class PyTrajectoryFunctionWrapper(TrajectoryFunctionWrapper):
             # see e.g. https://stackoverflow.com/questions/46439740/safe-to-call-multiprocessing-from-a-thread-in-python
             #ctx = multiprocessing.get_context("forkserver")
             #with ProcessPoolExecutor(1, mp_context=ctx) as pool:
-            with ThreadPoolExecutor(max_workers=1,
-                                    thread_name_prefix="PyTrajFunc_thread",
-                                    ) as pool:
-                vals = await loop.run_in_executor(pool, func, traj)
+            # NOTE: we use one shared executor (instead of a new one per call)
+            #       to avoid the overhead of thread creation and shutdown
+            vals = await loop.run_in_executor(_get_py_traj_func_executor(),
+                                              func, traj)
         return vals
 
     async def __call__(self, value):
@@ -265,6 +503,231 @@ class PyTrajectoryFunctionWrapper(TrajectoryFunctionWrapper):
         return self._func(value, **self._call_kwargs)
 
 
+def _load_positions(traj, atom_selection: str = "all") -> np.ndarray:
+    # read the positions of the selected atoms of the given trajectory into
+    # one array, shape=(n_frames, n_selected_atoms, 3)
+    # NOTE: this opens the trajectory files, i.e. call it only while holding
+    #       the MAX_FILES_OPEN semaphore
+    universe = mda.Universe(traj.structure_file, *traj.trajectory_files)
+    try:
+        atoms = universe.select_atoms(atom_selection)
+        positions = np.empty((len(universe.trajectory), atoms.n_atoms, 3),
+                             dtype=np.float32,
+                             )
+        for i, _ in enumerate(universe.trajectory):
+            positions[i] = atoms.positions
+    finally:
+        # make sure the trajectory is closed by MDAnalysis
+        universe.trajectory.close()
+    return positions
+
+
+class NumbaTrajectoryFunctionWrapper(PyTrajectoryFunctionWrapper):
+    """
+    Wrap numerical python functions, jit-compiled with numba, for use on
+    :class:`asyncmd.Trajectory`.
+
+    In contrast to :class:`PyTrajectoryFunctionWrapper` the wrapped function
+    is not called with the trajectory but with a numpy array of the positions
+    of the selected atoms in all frames of the trajectory
+    (shape=(n_frames, n_selected_atoms, 3), dtype=float32) and must be
+    compilable in numbas nopython mode.
+    Note that the positions of all frames are held in memory at once, i.e.
+    use ``atom_selection`` to only load the atoms your function needs, e.g.
+    for 50000 atoms and 10000 frames all positions take about 6 GB.
+    The positions are read as they are in the trajectory files, i.e. no
+    MDAnalysis (on-the-fly) transformations are applied.
+    It is compiled (with ``numba.njit(**jit_kwargs)``) lazily on first use.
+    If numba is not available, the python function is used as is.
+
+    Attributes
+    ----------
+    function : callable
+        The wrapped (python) callable.
+    call_kwargs : dict
+        Keyword arguments for wrapped function.
+    jit_kwargs : dict
+        Keyword arguments for ``numba.njit``, by default {"cache": True}
+    atom_selection : str
+        MDAnalysis selection string for the atoms to load the positions for,
+        by default "all".
+    run_inline : bool
+        Whether to call the wrapped function directly in the event loop
+        (instead of in a separate thread), by default False. Note that the
+        positions are always read in a separate thread.
+    """
+    def __init__(self, function, call_kwargs: typing.Optional[dict] = None,
+                 jit_kwargs: typing.Optional[dict] = None,
+                 atom_selection: str = "all", **kwargs):
+        """
+        Initialize a :class:`NumbaTrajectoryFunctionWrapper`.
+
+        Parameters
+        ----------
+        function : callable
+            The (synchronous) numerical callable to wrap, it will be called
+            with the positions array of the trajectory as first argument.
+        call_kwargs : dict, optional
+            Keyword arguments for `function`,
+            the keys will be used as keyword with the corresponding values,
+            by default {}
+        jit_kwargs : dict, optional
+            Keyword arguments for ``numba.njit``, by default {"cache": True}.
+            Note that the compiled function is called from a separate thread,
+            i.e. ``parallel=True`` can make the interpreter hang at exit
+            (depending on the numba threading layer). Caching is disabled
+            for functions without (retrievable) source.
+        atom_selection : str, optional
+            MDAnalysis selection string for the atoms to load the positions
+            for (and pass to `function`), by default "all".
+        """
+        if jit_kwargs is None:
+            jit_kwargs = {"cache": True}
+        # set before superclass init, such that _get_id_str works
+        self._jit_kwargs = dict(jit_kwargs)
+        self._atom_selection = None
+        self.atom_selection = atom_selection
+        super().__init__(function=function, call_kwargs=call_kwargs,
+                         **kwargs)
+
+    def __repr__(self) -> str:
+        return (f"NumbaTrajectoryFunctionWrapper(function={self._func}, "
+                + f"call_kwargs={self._call_kwargs}, "
+                + f"jit_kwargs={self._jit_kwargs}, "
+                + f"atom_selection={self._atom_selection})"
+                )
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        # the compiled function is not (necessarily) picklable,
+        # it is recreated (and recompiled) on the next call
+        state["_partial"] = None
+        return state
+
+    @property
+    def jit_kwargs(self):
+        """Keyword arguments used for ``numba.njit``."""
+        return MappingProxyType(self._jit_kwargs)
+
+    @jit_kwargs.setter
+    def jit_kwargs(self, value):
+        self._jit_kwargs = dict(value)
+        self._id = None  # invalidate ID, recalculated on next access
+        self._partial = None  # invalidate, recompiled on next call
+
+    @property
+    def atom_selection(self) -> str:
+        """MDAnalysis selection string for the atoms we load positions for."""
+        return self._atom_selection
+
+    @atom_selection.setter
+    def atom_selection(self, value: str):
+        if not isinstance(value, str):
+            raise TypeError("atom_selection must be a str, got "
+                            + f"{type(value)}.")
+        self._atom_selection = value
+        self._id = None  # invalidate ID, recalculated on next access
+
+    @PyTrajectoryFunctionWrapper.function.setter
+    def function(self, value):
+        # if we get an already jitted function use the python function,
+        # we compile it ourself (with our jit_kwargs)
+        value = getattr(value, "py_func", value)
+        PyTrajectoryFunctionWrapper.function.fset(self, value)
+
+    def _get_id_str(self):
+        # the id of the python function + call_kwargs, but different for
+        # different numba versions/jit options (e.g. fastmath can change the
+        # results) and different from the PyTrajectoryFunctionWrapper id
+        # for the same function and call_kwargs (not called with the same arg)
+        py_id = super()._get_id_str()
+        if py_id is None:
+            return None
+        h = hashlib.blake2b(digest_size=16)
+        h.update(py_id.encode("utf-8"))
+        h.update(f"\0{self._atom_selection}\0".encode("utf-8"))
+        if numba is None:
+            h.update(b"numba:None")
+        else:
+            h.update(f"numba:{numba.__version__}".encode("utf-8"))
+            for k, v in sorted(self._jit_kwargs.items()):
+                h.update(f"\0{k}\0{v}".encode("utf-8"))
+        return h.hexdigest()
+
+    def _make_partial(self):
+        # return the (compiled) callable to apply on the positions array
+        if numba is None:
+            func = self._func
+        else:
+            jit_kwargs = self._jit_kwargs
+            if self._func_src is None and jit_kwargs.get("cache", False):
+                # numba can not cache functions without source file
+                jit_kwargs = {**jit_kwargs, "cache": False}
+            func = numba.njit(**jit_kwargs)(self._func)
+        if len(self._call_kwargs) > 0:
+            return functools.partial(func, **self._call_kwargs)
+        return func
+
+    async def get_values_for_trajectory(self, traj):
+        """
+        Apply wrapped function asyncronously on given trajectory.
+
+        Parameters
+        ----------
+        traj : asyncmd.Trajectory
+            Input trajectory.
+
+        Returns
+        -------
+        iterable, usually np.ndarray
+            The values of the wrapped function when applied on the positions
+            of the trajectory.
+        """
+        func = self._partial
+        if func is None:
+            func = self._partial = self._make_partial()
+        loop = asyncio.get_running_loop()
+        # read the positions (the files are closed again after reading)
+        async with _SEMAPHORES["MAX_FILES_OPEN"]:
+            async with _SEMAPHORES["MAX_PROCESS"]:
+                positions = await loop.run_in_executor(
+                                                _get_py_traj_func_executor(),
+                                                _load_positions, traj,
+                                                self._atom_selection,
+                                                       )
+        if self.run_inline:
+            # NOTE: this blocks the event loop until func returns
+            return func(positions)
+        async with _SEMAPHORES["MAX_PROCESS"]:
+            vals = await loop.run_in_executor(_get_py_traj_func_executor(),
+                                              func, positions)
+        return vals
+
+    async def __call__(self, value):
+        """
+        Apply wrapped function asyncronously on given trajectory.
+
+        Parameters
+        ----------
+        value : asyncmd.Trajectory
+            Input trajectory.
+
+        Returns
+        -------
+        iterable, usually np.ndarray
+            The values of the wrapped function when applied on the positions
+            of the trajectory.
+        """
+        if not isinstance(value, Trajectory):
+            raise TypeError(f"{type(self)} must be called"
+                            + " with an `asyncmd.Trajectory` "
+                            + f"but was called with {type(value)}.")
+        if self.id is not None:
+            return await value._apply_wrapped_func(self.id, self)
+        # no id, no caching, but we still call the function with positions
+        return await self.get_values_for_trajectory(value)
+
+
 # TODO: document what we fill/replace in the master sbatch script!
 # TODO: document what we expect from the executable!
 #       -> accept struct, traj, outfile
@@ -342,8 +805,10 @@ class SlurmTrajectoryFunctionWrapper(TrajectoryFunctionWrapper):
         """
         # property defaults before superclass init to be resettable via kwargs
         self._slurm_jobname = None
-        super().__init__(**kwargs)
+        # and set this before superclass init, such that _get_id_str works
         self._executable = None
+        self._kwargs_cmd_suffix = ""
+        super().__init__(**kwargs)
         # we expect sbatch_script to be a str,
         # but it could be either the path to a submit script or the content of
         # the submission script directly
@@ -371,32 +836,60 @@ class SlurmTrajectoryFunctionWrapper(TrajectoryFunctionWrapper):
 
     @slurm_jobname.setter
     def slurm_jobname(self, val):
+        # None resets to the default (id based) jobname
+        if val is not None and not isinstance(val, str):
+            raise TypeError(f"slurm_jobname must be a str, got {type(val)}.")
         self._slurm_jobname = val
 
     def __repr__(self) -> str:
         return (f"SlurmTrajectoryFunctionWrapper(executable={self._executable}, "
-                + f"call_kwargs={self.call_kwargs})"
+                + f"call_kwargs={self._call_kwargs})"
                 )
 
+    def __setstate__(self, d: dict):
+        self.__dict__ = d
+        # objects pickled with older versions of asyncmd have no precomputed
+        # call_kwargs part of the command string
+        if "_kwargs_cmd_suffix" not in d:
+            self._kwargs_cmd_suffix = self._make_kwargs_cmd_suffix()
+
     def _get_id_str(self):
         # calculate a hash over executable and call_kwargs dict
         # this should be unique and portable, i.e. it should enable us to make
         # ensure that the cached values will only be used for the same function
         # called with the same arguments
-        id = 0
-        # NOTE: addition is commutative, i.e. order does not matter here!
-        for k, v in self._call_kwargs.items():
-            # hash the value
-            id += int(hashlib.blake2b(str(v).encode('utf-8')).hexdigest(), 16)
-            # hash the key
-            id += int(hashlib.blake2b(str(k).encode('utf-8')).hexdigest(), 16)
-        # and add the executable hash
-        with open(self.executable, "rb") as exe_file:
-            # NOTE: we assume that executable is small enough to read at once
-            #       if this crashes becasue of OOM we should use chunks...
-            data = exe_file.read()
-        id += int(hashlib.blake2b(data).hexdigest(), 16)
-        return str(id)  # return a str because we want to use it as dict keys
+        if self._executable is None:
+            # no executable (yet), no id
+            return None
+        h = hashlib.blake2b(digest_size=16)
+        self._hash_call_kwargs(h)
+        # and add the (cached) hash of the executable
+        h.update(_get_executable_digest(self.executable))
+        return h.hexdigest()  # return a str because we want to use it as dict keys
+
+    @TrajectoryFunctionWrapper.call_kwargs.setter
+    def call_kwargs(self, value):
+        TrajectoryFunctionWrapper.call_kwargs.fset(self, value)
+        # build the part of the command string for the call_kwargs only once
+        # (it is the same for all trajectories)
+        self._kwargs_cmd_suffix = self._make_kwargs_cmd_suffix()
+
+    def _make_kwargs_cmd_suffix(self) -> str:
+        # the (shell escaped) call_kwargs part of the command string
+        # NOTE: we start with the empty string such that the joined suffix
+        #       starts with a space (if there are any call_kwargs)
+        suffix_parts = [""]
+        for key, val in self._call_kwargs.items():
+            # shell escape only the values,
+            # the keys (i.e. option names/flags) should be no issue
+            suffix_parts.append(str(key))
+            if isinstance(val, list):
+                # enable lists of arguments for the same key,
+                # can then be used e.g. with pythons argparse `nargs="*"` or `nargs="+"`
+                suffix_parts.extend(shlex.quote(str(v)) for v in val)
+            else:
+                suffix_parts.append(shlex.quote(str(val)))
+        return " ".join(suffix_parts)
 
     @property
     def executable(self):
@@ -408,7 +901,7 @@ class SlurmTrajectoryFunctionWrapper(TrajectoryFunctionWrapper):
         exe = ensure_executable_available(val)
         # if we get here it should be save to set, i.e. it exists + has X-bit
         self._executable = exe
-        self._id = self._get_id_str()  # get the new hash/id
+        self._id = None  # invalidate ID, recalculated on next access
 
     async def get_values_for_trajectory(self, traj):
         """
@@ -438,32 +931,29 @@ class SlurmTrajectoryFunctionWrapper(TrajectoryFunctionWrapper):
                                                    ))
         # we expect executable to take 3 postional args:
         # struct traj outfile
-        cmd_str = f"{self.executable} {os.path.abspath(traj.structure_file)}"
-        cmd_str += f" {' '.join(os.path.abspath(t) for t in traj.trajectory_files)}"
-        cmd_str += f" {result_file}"
-        if len(self.call_kwargs) > 0:
-            for key, val in self.call_kwargs.items():
-                # shell escape only the values,
-                # the keys (i.e. option names/flags) should be no issue
-                if isinstance(val, list):
-                    # enable lists of arguments for the same key,
-                    # can then be used e.g. with pythons argparse `nargs="*"` or `nargs="+"`
-                    cmd_str += f" {key} {' '.join([shlex.quote(str(v)) for v in val])}"
-                else:
-                    cmd_str += f" {key} {shlex.quote(str(val))}"
+        cmd_parts = [self.executable, os.path.abspath(traj.structure_file)]
+        cmd_parts.extend(os.path.abspath(t) for t in traj.trajectory_files)
+        cmd_parts.append(result_file)
+        # and add the (shell escaped) call_kwargs, precomputed in the setter
+        cmd_str = " ".join(cmd_parts) + self._kwargs_cmd_suffix
         # now prepare the sbatch script
         script = self.sbatch_script.format(cmd_str=cmd_str)
         # write it out
         sbatch_fname = os.path.join(tra_dir,
                                     tra_name + "_" + self.slurm_jobname + ".slurm")
-        if os.path.exists(sbatch_fname):
-            # TODO: should we raise an error?
-            logger.error("Overwriting existing submission file (%s).",
-                         sbatch_fname,
-                         )
         async with _SEMAPHORES["MAX_FILES_OPEN"]:
-            async with aiofiles.open(sbatch_fname, 'w') as f:
-                await f.write(script)
+            try:
+                # exclusive creation, i.e. fails if the file exists already
+                # (saves us a separate and racy check for existence)
+                async with aiofiles.open(sbatch_fname, 'x') as f:
+                    await f.write(script)
+            except FileExistsError:
+                # TODO: should we raise an error?
+                logger.error("Overwriting existing submission file (%s).",
+                             sbatch_fname,
+                             )
+                async with aiofiles.open(sbatch_fname, 'w') as f:
+                    await f.write(script)
         # NOTE: we set returncode to 2 (what slurmprocess returns in case of
         # node failure) and rerun/retry until we either get a completed job
         # or a non-node-failure error
@@ -497,6 +987,10 @@ class SlurmTrajectoryFunctionWrapper(TrajectoryFunctionWrapper):
         if self.load_results_func is None:
             # we do not have '.npy' ending in results_file,
             # numpy.save() adds it if it is not there, so we need it here
+            # NOTE: no need for mmap_mode here, we remove the file directly
+            #       after loading, i.e. we need the values in memory anyway
+            #       and np.load reads (non-object) npy files directly into
+            #       the returned array
             load_func = np.load
             fname_results = result_file + ".npy"
         else:
@@ -519,13 +1013,30 @@ class SlurmTrajectoryFunctionWrapper(TrajectoryFunctionWrapper):
                              )
         return vals
 
+    # TODO: batch submission of multiple trajectories as one job array
+    #       (sbatch --array) to reduce the load on the scheduler?
+    # NOTE: this is not straightforward with the current slurm module:
+    #       The SlurmClusterMediator only parses (and monitors) whole jobs
+    #       from sacct (no array task ids like '1234_5'), SlurmProcess
+    #       cancels/removes stdfiles per job and we retry single trajectories
+    #       on node failures (exitcode 2), i.e. we would need per array
+    #       task states, retries and cancelation in asyncmd.slurm first.
     async def _run_slurm_job(self, sbatch_fname: str, result_file: str,
                              slurm_workdir: str,
                              ) -> tuple[int,slurm.SlurmProcess,bytes,bytes]:
         # submit and run slurm-job
-        if _SEMAPHORES["SLURM_MAX_JOB"] is not None:
-            await _SEMAPHORES["SLURM_MAX_JOB"].acquire()
-        try:  # this try is just to make sure we always release the semaphore
+        async with contextlib.AsyncExitStack() as stack:
+            # the semaphore is released when we leave the stack
+            if _SEMAPHORES["SLURM_MAX_JOB"] is not None:
+                await stack.enter_async_context(_SEMAPHORES["SLURM_MAX_JOB"])
+            # clean up the sbatch file and potentialy written result file if
+            # we get canceled (also when canceled while submitting)
+            # NOTE: this runs before the semaphore is released
+            stack.push_async_exit(functools.partial(
+                                        self._remove_files_on_cancel,
+                                        sbatch_fname=sbatch_fname,
+                                        result_file=result_file,
+                                                    ))
             slurm_proc = await slurm.create_slurmprocess_submit(
                                                 jobname=self.slurm_jobname,
                                                 sbatch_script=sbatch_fname,
@@ -535,20 +1046,25 @@ class SlurmTrajectoryFunctionWrapper(TrajectoryFunctionWrapper):
                                                 # sleep 5 s between checking
                                                 sleep_time=5,
                                                                 )
-            # wait for the slurm job to finish
-            # also cancel the job when this future is canceled
-            stdout, stderr = await slurm_proc.communicate()
+            try:
+                # wait for the slurm job to finish
+                # also cancel the job when this future is canceled
+                stdout, stderr = await slurm_proc.communicate()
+            except asyncio.CancelledError:
+                slurm_proc.kill()
+                raise  # reraise CancelledError for encompassing coroutines
             returncode = slurm_proc.returncode
             return returncode, slurm_proc, stdout, stderr
-        except asyncio.CancelledError:
-            slurm_proc.kill()
-            # clean up the sbatch file and potentialy written result file
+
+    async def _remove_files_on_cancel(self, exc_type, exc, tb, *,
+                                      sbatch_fname: str, result_file: str,
+                                      ) -> bool:
+        # exit callback for the AsyncExitStack in _run_slurm_job
+        if exc_type is not None and issubclass(exc_type,
+                                               asyncio.CancelledError):
             res_fname = (result_file + ".npy" if self.load_results_func is None
                          else result_file)
             await asyncio.gather(remove_file_if_exist_async(sbatch_fname),
                                  remove_file_if_exist_async(res_fname),
                                  )
-            raise  # reraise CancelledError for encompassing coroutines
-        finally:
-            if _SEMAPHORES["SLURM_MAX_JOB"] is not None:
-                _SEMAPHORES["SLURM_MAX_JOB"].release()
+        return False  # never suppress the exception
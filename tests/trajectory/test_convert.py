@@ -21,6 +21,7 @@ from asyncmd.trajectory.convert import (TrajectoryConcatenator,
                                         NoModificationFrameExtractor,
                                         InvertedVelocitiesFrameExtractor,
                                         RandomVelocitiesFrameExtractor,
+                                        _R_TIMES_TENTH,
                                         )
 
 
@@ -33,6 +34,11 @@ class TBase:
                 trajectory_files="tests/test_data/trajectory/ala_traj.trr",
                 structure_file="tests/test_data/trajectory/ala.tpr"
                                            )
+        # the same 18 frames (without velocities) with the same structure file
+        self.ala_traj_xtc = asyncmd.Trajectory(
+                trajectory_files="tests/test_data/trajectory/ala_traj.xtc",
+                structure_file="tests/test_data/trajectory/ala.tpr"
+                                               )
         # some simple MDAnalysis trafos
         # these ones can just be attached (do not depend on the universe or
         #  atomgroups therein)
@@ -127,9 +133,12 @@ class Test_TrajectoryConcatenator(TBase):
                               [False, True],
                               )
                              )
+    # whether all segments are from the same trajectory or alternate between
+    # two different trajectories (i.e. we need a new universe per segment)
+    @pytest.mark.parametrize("mixed_trajs", [True, False])
     @pytest.mark.parametrize("use_async", [True, False])
     @pytest.mark.asyncio
-    async def test_concatenate(self, tmpdir, slices, use_async,
+    async def test_concatenate(self, tmpdir, slices, use_async, mixed_trajs,
                                invert_v_for_negative_step,
                                remove_double_frames,
                                mda_transformations,  # whether we use simple mda trafos
@@ -153,24 +162,27 @@ class Test_TrajectoryConcatenator(TBase):
                 mda_transformations=None,
                 mda_transformations_setup_func=None,
                                                   )
+        if mixed_trajs:
+            trajs = [self.ala_traj if i % 2 == 0 else self.ala_traj_xtc
+                     for i in range(len(slices))]
+        else:
+            trajs = [self.ala_traj for _ in range(len(slices))]
         # actual concatenation
         if use_async:
             out_traj = await concatenator.concatenate_async(
-                trajs=[self.ala_traj for _ in range(len(slices))],
+                trajs=trajs,
                 slices=slices,
                 tra_out=tmpdir + "/tra_out.trr",
                 remove_double_frames=remove_double_frames,
                                                             )
         else:
             out_traj = concatenator.concatenate(
-                trajs=[self.ala_traj for _ in range(len(slices))],
+                trajs=trajs,
                 slices=slices,
                 tra_out=tmpdir + "/tra_out.trr",
                 remove_double_frames=remove_double_frames,
                                                 )
         # get universes of in and out to compare
-        u_original = mda.Universe(self.ala_traj.structure_file,
-                                  *self.ala_traj.trajectory_files)
         u_written = mda.Universe(out_traj.structure_file,
                                  *out_traj.trajectory_files)
         # step through all the slices in the original and compare each frame to
@@ -178,7 +190,9 @@ class Test_TrajectoryConcatenator(TBase):
         written_frame_count = 0
         if remove_double_frames:
             last_time_seen = None
-        for sl in slices:
+        for traj, sl in zip(trajs, slices):
+            u_original = mda.Universe(traj.structure_file,
+                                      *traj.trajectory_files)
             start, stop, step = sl
             for ts_original in u_original.trajectory[start:stop:step]:
                 if remove_double_frames:
@@ -208,10 +222,11 @@ class Test_TrajectoryConcatenator(TBase):
                 # coordinates
                 assert np.allclose(all_pos_original,
                                    all_atoms_extracted.positions)
-                # and velocities
-                vel_factor = -1. if invert_v_for_negative_step and step < 0 else 1.
-                assert np.allclose(all_atoms_original.velocities,
-                                   vel_factor * all_atoms_extracted.velocities)
+                # and velocities (the xtc has none)
+                if ts_original.has_velocities:
+                    vel_factor = -1. if invert_v_for_negative_step and step < 0 else 1.
+                    assert np.allclose(all_atoms_original.velocities,
+                                       vel_factor * all_atoms_extracted.velocities)
                 # increment written frame counter by one
                 written_frame_count += 1
         # make sure that we have steped through the whole written trajectory
@@ -395,6 +410,90 @@ class Test_NoModificationFrameExtractor(TBase_FrameExtractors):
                            )
 
 
+    @pytest.mark.parametrize("indices", [[0], [5, 10, 17], [17, 0, 5, 5]])
+    @pytest.mark.parametrize("use_async", [True, False])
+    @pytest.mark.asyncio
+    async def test_extract_many(self, tmpdir, indices, use_async):
+        extractor = NoModificationFrameExtractor()
+        if use_async:
+            out_traj = await extractor.extract_many_async(
+                                        outfile=tmpdir + "/out_frames.trr",
+                                        traj_in=self.ala_traj,
+                                        indices=indices,
+                                                          )
+        else:
+            out_traj = extractor.extract_many(
+                                        outfile=tmpdir + "/out_frames.trr",
+                                        traj_in=self.ala_traj,
+                                        indices=indices,
+                                              )
+        assert len(out_traj) == len(indices)
+        u_original = mda.Universe(self.ala_traj.structure_file,
+                                  *self.ala_traj.trajectory_files)
+        u_written = mda.Universe(out_traj.structure_file,
+                                 *out_traj.trajectory_files)
+        # frames must be written in the order given by indices
+        for ts_written, idx in zip(u_written.trajectory, indices):
+            ts_original = u_original.trajectory[idx]
+            assert np.allclose(ts_original.positions, ts_written.positions)
+            assert np.allclose(ts_original.velocities, ts_written.velocities)
+
+
+    def test_keep_universe_open(self, tmpdir):
+        # by default we do not keep any universe (and files) open
+        extractor = NoModificationFrameExtractor()
+        _ = extractor.extract(outfile=tmpdir + "/out_frame.trr",
+                              traj_in=self.ala_traj,
+                              idx=0,
+                              )
+        assert extractor._cached_universe == (None, None)
+        extractor = NoModificationFrameExtractor(keep_universe_open=True)
+        _ = extractor.extract(outfile=tmpdir + "/out_frame_open.trr",
+                              traj_in=self.ala_traj,
+                              idx=0,
+                              )
+        assert extractor._cached_universe[1] is not None
+        extractor.close()
+        assert extractor._cached_universe == (None, None)
+
+    def test_cached_universe_trafos_and_close(self, tmpdir):
+        extractor = NoModificationFrameExtractor(keep_universe_open=True)
+        u_original = mda.Universe(self.ala_traj.structure_file,
+                                  *self.ala_traj.trajectory_files)
+        pos_original = u_original.trajectory[0].positions.copy()
+        out_traj = extractor.extract(outfile=tmpdir + "/out_frame.trr",
+                                     traj_in=self.ala_traj,
+                                     idx=0,
+                                     )
+        u_written = mda.Universe(out_traj.structure_file,
+                                 *out_traj.trajectory_files)
+        assert np.allclose(pos_original, u_written.atoms.positions)
+        # setting trafos after the first extraction must not use the cached
+        # universe without trafos
+        extractor.mda_transformations = self.mda_trafos
+        out_traj = extractor.extract(outfile=tmpdir + "/out_frame_shifted.trr",
+                                     traj_in=self.ala_traj,
+                                     idx=0,
+                                     )
+        u_written = mda.Universe(out_traj.structure_file,
+                                 *out_traj.trajectory_files)
+        # we shift x and y of all atoms by 5 \AA each
+        pos_shifted = pos_original.copy()
+        pos_shifted[:, :2] += 5
+        assert np.allclose(pos_shifted, u_written.atoms.positions)
+        # close releases the cached universe, extracting must still work
+        extractor.close()
+        assert extractor._cached_universe == (None, None)
+        out_traj = extractor.extract(outfile=tmpdir + "/out_frame_closed.trr",
+                                     traj_in=self.ala_traj,
+                                     idx=0,
+                                     )
+        u_written = mda.Universe(out_traj.structure_file,
+                                 *out_traj.trajectory_files)
+        assert np.allclose(pos_shifted, u_written.atoms.positions)
+        extractor.close()
+
+
 class Test_InvertedVelocitiesFrameExtractor(TBase_FrameExtractors):
     @pytest.mark.parametrize("idx", [0, 5, 10, 17])
     @pytest.mark.parametrize(["mda_transformations", "mda_transformations_setup_func"],
@@ -434,6 +533,63 @@ class Test_InvertedVelocitiesFrameExtractor(TBase_FrameExtractors):
 
 
 class Test_RandomVelocitiesFrameExtractor(TBase_FrameExtractors):
+    def test_prepare_and_masses(self, tmpdir):
+        u = mda.Universe(self.ala_traj.structure_file,
+                         *self.ala_traj.trajectory_files)
+        # masses from prepare and from init must give the same sigma
+        extractor_prep = RandomVelocitiesFrameExtractor(T=303.)
+        extractor_prep.prepare(u)
+        extractor_init = RandomVelocitiesFrameExtractor(
+                                        T=303., masses=u.atoms.masses,
+                                                        )
+        assert np.allclose(extractor_prep._get_sigma(u),
+                           extractor_init._get_sigma(u))
+        _ = extractor_prep.extract(outfile=tmpdir + "/out_frame.trr",
+                                   traj_in=self.ala_traj,
+                                   idx=0,
+                                   )
+        # wrong number of masses must err
+        extractor_wrong = RandomVelocitiesFrameExtractor(
+                                        T=303., masses=u.atoms.masses[:-1],
+                                                         )
+        with pytest.raises(ValueError):
+            _ = extractor_wrong.extract(outfile=tmpdir + "/out_frame2.trr",
+                                        traj_in=self.ala_traj,
+                                        idx=0,
+                                        )
+
+    def test_setstate_old_pickle(self, tmpdir):
+        # extractors pickled with older asyncmd versions lack the attributes
+        # for the cached universe and the user supplied masses
+        extractor = RandomVelocitiesFrameExtractor(T=303.)
+        old_state = {"mda_transformations": None,
+                     "mda_transformations_setup_func": None,
+                     "T": extractor.T,
+                     "_rng": extractor._rng,
+                     }
+        unpickled = RandomVelocitiesFrameExtractor.__new__(
+                                            RandomVelocitiesFrameExtractor)
+        unpickled.__setstate__(old_state)
+        assert unpickled.keep_universe_open is False
+        _ = unpickled.extract(outfile=tmpdir + "/out_frame.trr",
+                              traj_in=self.ala_traj,
+                              idx=0,
+                              )
+
+    def test_sigma_from_masses(self):
+        # includes a zero mass (e.g. a virtual site), which must not err
+        masses = np.array([1.008, 12.011, 15.999, 0.])
+        T = 303.
+        extractor = RandomVelocitiesFrameExtractor(T=T)
+        with np.errstate(divide="ignore"):
+            sigma = extractor._sigma_from_masses(masses)
+        expected = np.sqrt((T * _R_TIMES_TENTH) / masses[:-1])
+        assert sigma.dtype == np.float32
+        assert sigma.shape == (3 * len(masses),)
+        # sigma is repeated for the 3 cartesian dimensions
+        assert np.allclose(sigma[:-3], np.repeat(expected, 3))
+        assert np.all(np.isinf(sigma[-3:]))
+
     # NOTE: no need to test the full array of stuff we already tested for the
     #       other FrameExtractor subclasses
     @pytest.mark.parametrize("idx", [0, #5, 10, 17
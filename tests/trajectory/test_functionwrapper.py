@@ -0,0 +1,311 @@
+# This file is part of asyncmd.
+#
+# asyncmd is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# asyncmd is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with asyncmd. If not, see <https://www.gnu.org/licenses/>.
+import pytest
+import os
+import importlib.util
+import pickle
+import shutil
+import numpy as np
+import MDAnalysis as mda
+
+from unittest.mock import AsyncMock, patch
+
+import asyncmd
+from asyncmd import Trajectory
+from asyncmd.trajectory.functionwrapper import (PyTrajectoryFunctionWrapper,
+                                                NumbaTrajectoryFunctionWrapper,
+                                                SlurmTrajectoryFunctionWrapper,
+                                                _get_py_traj_func_executor,
+                                                )
+
+
+def mean_x(positions, factor=1.):
+    # numerical CV (compilable with numba) for the NumbaTrajectoryFunctionWrapper
+    out = np.empty(positions.shape[0])
+    for i in range(positions.shape[0]):
+        out[i] = factor * positions[i, :, 0].mean()
+    return out
+
+
+def n_frames(traj, factor=1):
+    # simple python CV for the PyTrajectoryFunctionWrapper
+    return np.array([factor * len(traj)])
+
+
+class TBase:
+    # base class for all functionwrapper.py tests
+    def setup_method(self):
+        asyncmd.trajectory._forget_all_trajectories()
+        self.ran_gen = np.random.default_rng()
+
+    def copy_ala_traj(self, dirname):
+        # copy the ala traj and structure into dirname, such that all files
+        # written next to the trajectory end up in a temporary directory
+        traj_file = shutil.copy("tests/test_data/trajectory/ala_traj.trr",
+                                dirname)
+        struct_file = shutil.copy("tests/test_data/trajectory/ala.tpr",
+                                  dirname)
+        return Trajectory(trajectory_files=traj_file,
+                          structure_file=struct_file,
+                          )
+
+
+class Test_SlurmTrajectoryFunctionWrapper(TBase):
+    def make_wrapper(self, tmp_path, **kwargs):
+        # a dummy executable (we never call it, _run_slurm_job is mocked)
+        exe = tmp_path / "dummy_exe.sh"
+        exe.write_text("#!/bin/sh\n")
+        os.chmod(exe, 0o755)
+        return SlurmTrajectoryFunctionWrapper(
+                                executable=str(exe),
+                                sbatch_script="#!/bin/bash\n{cmd_str}\n",
+                                **kwargs,
+                                              )
+
+    def test_slurm_jobname(self, tmp_path):
+        wrapper = self.make_wrapper(tmp_path=tmp_path)
+        assert wrapper.slurm_jobname == f"CVfunc_id_{wrapper.id}"
+        wrapper = self.make_wrapper(tmp_path=tmp_path, slurm_jobname="test")
+        assert wrapper.slurm_jobname == "test"
+        with pytest.raises(TypeError):
+            _ = self.make_wrapper(tmp_path=tmp_path, slurm_jobname=5)
+        with pytest.raises(TypeError):
+            wrapper.slurm_jobname = 5
+        # private attributes can not be set via kwargs
+        wrapper = self.make_wrapper(tmp_path=tmp_path, _slurm_jobname="test")
+        assert wrapper.slurm_jobname == f"CVfunc_id_{wrapper.id}"
+
+    def test_setstate_old_pickle(self, tmp_path):
+        wrapper = self.make_wrapper(tmp_path=tmp_path,
+                                    call_kwargs={"--flag": "value with space"},
+                                    )
+        # wrappers pickled with older versions have no _kwargs_cmd_suffix
+        old_state = {k: v for k, v in wrapper.__dict__.items()
+                     if k != "_kwargs_cmd_suffix"}
+        unpickled = SlurmTrajectoryFunctionWrapper.__new__(
+                                            SlurmTrajectoryFunctionWrapper)
+        unpickled.__setstate__(old_state)
+        assert unpickled._kwargs_cmd_suffix == wrapper._kwargs_cmd_suffix
+        assert unpickled._kwargs_cmd_suffix == " --flag 'value with space'"
+
+    @pytest.mark.parametrize("sbatch_file_exists", [True, False])
+    @pytest.mark.asyncio
+    async def test_get_values_for_trajectory(self, tmp_path,
+                                             sbatch_file_exists):
+        wrapper = self.make_wrapper(tmp_path=tmp_path,
+                                    call_kwargs={"--flag": "value with space"},
+                                    )
+        traj = self.copy_ala_traj(tmp_path)
+        values = self.ran_gen.random(size=(len(traj), 2))
+        tra_dir, tra_name = os.path.split(traj.trajectory_files[0])
+        sbatch_fname = os.path.join(tra_dir,
+                                    tra_name + "_" + wrapper.slurm_jobname
+                                    + ".slurm")
+        if sbatch_file_exists:
+            # leftover from a previous run, must be overwritten
+            with open(sbatch_fname, "w") as f:
+                f.write("leftover")
+        written_scripts = []
+
+        async def fake_run_slurm_job(sbatch_fname, result_file,
+                                     slurm_workdir):
+            with open(sbatch_fname, "r") as f:
+                written_scripts.append(f.read())
+            np.save(result_file, values)
+            return 0, None, b"", b""
+
+        wrapper._run_slurm_job = AsyncMock(side_effect=fake_run_slurm_job)
+        vals = await wrapper.get_values_for_trajectory(traj)
+        assert np.allclose(vals, values)
+        wrapper._run_slurm_job.assert_awaited_once()
+        assert len(written_scripts) == 1
+        script = written_scripts[0]
+        assert script.startswith("#!/bin/bash\n" + wrapper.executable)
+        assert "--flag 'value with space'" in script
+        # sbatch script and results file are removed after loading
+        assert not os.path.exists(sbatch_fname)
+        assert not any(f.endswith(".npy") for f in os.listdir(tra_dir))
+
+
+class Test_PyTrajectoryFunctionWrapper(TBase):
+    def test_executor_follows_max_process(self):
+        num = os.cpu_count() + 5
+        try:
+            asyncmd.config.set_max_process(num=num)
+            executor = _get_py_traj_func_executor()
+            assert executor._max_workers == num
+            # the same executor is reused as long as the number does not change
+            assert _get_py_traj_func_executor() is executor
+        finally:
+            # reset to default
+            asyncmd.config.set_max_process()
+        assert _get_py_traj_func_executor() is not executor
+
+    @pytest.mark.parametrize("run_inline", [True, False])
+    @pytest.mark.asyncio
+    async def test_run_inline(self, run_inline):
+        traj = Trajectory(
+                    trajectory_files="tests/test_data/trajectory/ala_traj.trr",
+                    structure_file="tests/test_data/trajectory/ala.tpr",
+                          )
+        wrapper = PyTrajectoryFunctionWrapper(n_frames, run_inline=run_inline)
+        assert wrapper.run_inline is run_inline
+        with patch("asyncmd.trajectory.functionwrapper._get_py_traj_func_executor",
+                   side_effect=_get_py_traj_func_executor,
+                   ) as get_executor:
+            vals = await wrapper.get_values_for_trajectory(traj)
+        assert np.array_equal(vals, [len(traj)])
+        # inline means we never touch the executor
+        assert get_executor.called is not run_inline
+
+    @pytest.mark.asyncio
+    async def test_setstate_old_pickle(self):
+        traj = Trajectory(
+                    trajectory_files="tests/test_data/trajectory/ala_traj.trr",
+                    structure_file="tests/test_data/trajectory/ala.tpr",
+                          )
+        wrapper = PyTrajectoryFunctionWrapper(n_frames)
+        # wrappers pickled with older versions have no _partial
+        old_state = {k: v for k, v in wrapper.__dict__.items()
+                     if k != "_partial"}
+        unpickled = PyTrajectoryFunctionWrapper.__new__(
+                                            PyTrajectoryFunctionWrapper)
+        unpickled.__setstate__(old_state)
+        vals = await unpickled.get_values_for_trajectory(traj)
+        assert np.array_equal(vals, [len(traj)])
+        # and the usual roundtrip
+        unpickled = pickle.loads(pickle.dumps(wrapper))
+        assert unpickled.id == wrapper.id
+        vals = await unpickled.get_values_for_trajectory(traj)
+        assert np.array_equal(vals, [len(traj)])
+
+    def test_init_kwargs(self):
+        # run_inline has a (bool) class default, i.e. its type is checked
+        with pytest.raises(TypeError):
+            _ = PyTrajectoryFunctionWrapper(n_frames, run_inline=1)
+        # private attributes and unknown kwargs are ignored
+        wrapper = PyTrajectoryFunctionWrapper(n_frames, _id="fake_id",
+                                              not_an_attribute=True,
+                                              )
+        assert wrapper.id != "fake_id"
+        assert wrapper.id == PyTrajectoryFunctionWrapper(n_frames).id
+        assert not hasattr(wrapper, "not_an_attribute")
+        assert not any(k.startswith("_")
+                       for k in PyTrajectoryFunctionWrapper._KWARG_TYPES)
+        assert PyTrajectoryFunctionWrapper._KWARG_TYPES["run_inline"] is bool
+
+    def test_id_same_code_different_defaults(self, tmp_path):
+        # the same def-statement with different defaults in different files
+        # results in equal code objects, but must result in different ids
+        funcs = []
+        for i, cutoff in enumerate([0.5, 0.7]):
+            fname = tmp_path / f"cv_module_{i}.py"
+            fname.write_text(f"def cv(traj, cutoff={cutoff}):\n"
+                             + "    return traj\n")
+            spec = importlib.util.spec_from_file_location(f"cv_module_{i}",
+                                                          fname)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            funcs.append(module.cv)
+        assert funcs[0].__code__ == funcs[1].__code__
+        # keep both wrappers (and functions) alive at the same time
+        wrappers = [PyTrajectoryFunctionWrapper(f) for f in funcs]
+        assert wrappers[0].id != wrappers[1].id
+
+    def test_id_invalidation(self):
+        wrapper = PyTrajectoryFunctionWrapper(n_frames)
+        id_no_kwargs = wrapper.id
+        assert id_no_kwargs is not None
+        # changing call_kwargs changes the id
+        wrapper.call_kwargs = {"factor": 2}
+        id_kwargs = wrapper.id
+        assert id_kwargs != id_no_kwargs
+        # and we get the same id back for the same function + call_kwargs
+        wrapper.call_kwargs = {}
+        assert wrapper.id == id_no_kwargs
+        # call_kwargs are read-only (and copied on setting)
+        with pytest.raises(TypeError):
+            wrapper.call_kwargs["factor"] = 3
+        call_kwargs = {"factor": 2}
+        wrapper.call_kwargs = call_kwargs
+        call_kwargs["factor"] = 3
+        assert wrapper.id == id_kwargs
+        # changing the function changes the id
+        wrapper.function = mean_x
+        assert wrapper.id not in [id_no_kwargs, id_kwargs]
+        assert wrapper.id == PyTrajectoryFunctionWrapper(
+                                        mean_x, call_kwargs={"factor": 2},
+                                                         ).id
+
+
+class Test_NumbaTrajectoryFunctionWrapper(TBase):
+    def expected_mean_x(self, traj, factor=1., atom_selection="all"):
+        u = mda.Universe(traj.structure_file, *traj.trajectory_files)
+        atoms = u.select_atoms(atom_selection)
+        return np.array([factor * atoms.positions[:, 0].mean()
+                         for _ in u.trajectory])
+
+    def test_id(self):
+        numba_wrapper = NumbaTrajectoryFunctionWrapper(mean_x)
+        py_wrapper = PyTrajectoryFunctionWrapper(mean_x)
+        assert numba_wrapper.id is not None
+        assert numba_wrapper.id != py_wrapper.id
+        # jit_kwargs are part of the id
+        old_id = numba_wrapper.id
+        numba_wrapper.jit_kwargs = {"cache": False}
+        assert numba_wrapper.id != old_id
+        # and so is the atom selection
+        old_id = numba_wrapper.id
+        numba_wrapper.atom_selection = "protein"
+        assert numba_wrapper.id != old_id
+        with pytest.raises(TypeError):
+            numba_wrapper.atom_selection = 5
+
+    @pytest.mark.parametrize("atom_selection", ["all", "protein"])
+    @pytest.mark.parametrize("call_kwargs", [None, {"factor": 2.}])
+    @pytest.mark.asyncio
+    async def test_values_and_pickle(self, tmp_path, call_kwargs,
+                                     atom_selection):
+        traj = self.copy_ala_traj(tmp_path)
+        wrapper = NumbaTrajectoryFunctionWrapper(mean_x,
+                                                 call_kwargs=call_kwargs,
+                                                 atom_selection=atom_selection,
+                                                 )
+        factor = 1. if call_kwargs is None else call_kwargs["factor"]
+        expected = self.expected_mean_x(traj, factor=factor,
+                                        atom_selection=atom_selection)
+        vals = await wrapper(traj)
+        assert np.allclose(vals, expected)
+        # must be picklable also after the first call (i.e. when compiled)
+        unpickled = pickle.loads(pickle.dumps(wrapper))
+        assert unpickled.id == wrapper.id
+        vals = await unpickled.get_values_for_trajectory(traj)
+        assert np.allclose(vals, expected)
+
+    @pytest.mark.asyncio
+    async def test_call_without_id(self, tmp_path):
+        traj = self.copy_ala_traj(tmp_path)
+        # no source available for eval'ed functions, i.e. no id
+        first_x = eval("lambda positions: positions[:, 0, 0] * 1.")
+        # NOTE: numba can not cache functions without source file, i.e. we
+        #       must not err with the default jit_kwargs (cache=True)
+        wrapper = NumbaTrajectoryFunctionWrapper(first_x)
+        assert wrapper.id is None
+        # we must still get called with the positions
+        vals = await wrapper(traj)
+        u = mda.Universe(traj.structure_file, *traj.trajectory_files)
+        assert np.allclose(vals, [ts.positions[0, 0] for ts in u.trajectory])
+        with pytest.raises(TypeError):
+            await wrapper(np.zeros((2, 3, 3)))